@@ -1,5 +1,6 @@
-from fastapi import APIRouter, UploadFile, Form, HTTPException
+from fastapi import APIRouter, UploadFile, Form, HTTPException, Request, Response
 import re
+import time
 import pdfplumber
 from io import BytesIO
 from sentence_transformers import SentenceTransformer
@@ -9,6 +10,12 @@ import google.genai as genai
 import os
 from dotenv import load_dotenv
 import json
+from collections import Counter
+from typing import Optional
+from app.core.document import Document
+from app.core import admission
+from app.core.config import settings
+from app.core.sessions import sessions, text_hash, SectionState
 
 load_dotenv()
 
@@ -20,7 +27,13 @@ model = SentenceTransformer('all-MiniLM-L6-v2')
 # Initialize Google Gemini client
 try:
     api_key = os.getenv("GEMINI_API_KEY")
-    if api_key:
+    if os.getenv("GEMINI_STUB"):
+        # Local stub for load testing - see load_test.py
+        from app.core.gemini_stub import StubGeminiClient
+        client = StubGeminiClient.from_env()
+        gemini_model_name = "gemini-stub"
+        LLM_ENABLED = True
+    elif api_key:
         client = genai.Client(api_key=api_key)
         gemini_model_name = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
         LLM_ENABLED = True
@@ -99,60 +112,84 @@ TECHNICAL_TERMS = {
     "performance optimization", "memory management", "multithreading", "concurrency",
 }
 
-def extract_keywords(text: str):
+def _compile_term_pattern(term: str):
+    if ' ' in term or '-' in term:
+        # Multi-word terms: allow spaces or hyphens
+        return re.compile(re.escape(term).replace(r'\ ', r'[\s\-]+'))
+    # Single-word terms: use word boundaries
+    return re.compile(r'\b' + re.escape(term) + r'\b')
+
+# Compiled once at import: (term, substring prefilter, pattern).
+# The first word of a term must appear in the text for the pattern to match,
+# so a cheap `in` check skips the regex scan for most terms.
+TERM_MATCHERS = tuple(
+    (term, term.split()[0], _compile_term_pattern(term))
+    for term in sorted(TECHNICAL_TERMS)
+)
+
+SPECIAL_PATTERNS = (
+    (re.compile(r'\bc\+\+\b'), 'c++'),
+    (re.compile(r'\bc#\b'), 'c#'),
+    (re.compile(r'\b\.net\b'), '.net'),
+    (re.compile(r'\bnode\.js\b'), 'nodejs'),
+)
+
+def parse_document(text: str) -> Document:
+    """
+    Build the shared document for a resume or job text and index its keywords.
+    Every scoring stage consumes this object instead of the raw string.
     """
-    Extract technical keywords - simplified regex-based extraction
+    doc = Document(text)
+    doc.keyword_positions = _locate_keywords(doc)
+    return doc
+
+def _locate_keywords(doc: Document) -> dict:
     """
-    if not text or not text.strip():
-        return set()
+    Find technical keywords in a parsed document - simplified regex-based extraction.
+    Returns a dict mapping each keyword to the offsets where it was found.
+    """
+    positions = {}
+    if doc.is_empty():
+        return positions
     
-    keywords = set()
-    text_lower = text.lower()
+    text_lower = doc.lower
     
     # Extract technical terms (handles both single words and multi-word phrases)
-    for term in TECHNICAL_TERMS:
-        if ' ' in term or '-' in term:
-            # Multi-word terms: allow spaces or hyphens
-            pattern = re.escape(term).replace(r'\ ', r'[\s\-]+')
-            if re.search(pattern, text_lower):
-                keywords.add(term)
-        else:
-            # Single-word terms: use word boundaries
-            pattern = r'\b' + re.escape(term) + r'\b'
-            if re.search(pattern, text_lower):
-                keywords.add(term)
+    for term, prefilter, pattern in TERM_MATCHERS:
+        if prefilter not in text_lower:
+            continue
+        offsets = [m.start() for m in pattern.finditer(text_lower)]
+        if offsets:
+            positions[term] = offsets
     
     # Extract special patterns
-    special_patterns = {
-        r'\bc\+\+\b': 'c++',
-        r'\bc#\b': 'c#',
-        r'\b\.net\b': '.net',
-        r'\bnode\.js\b': 'nodejs',
-    }
-    for pattern, term in special_patterns.items():
-        if re.search(pattern, text_lower):
-            keywords.add(term)
-    
-    # Extract acronyms (2-5 uppercase letters)
-    # Only match uppercase to avoid false positives like "can" (verb)
-    acronyms = re.findall(r'\b[A-Z]{2,5}\b', text)
-    for acro in acronyms:
-        acro_lower = acro.lower()
-        # Check if the acronym is in our technical terms list
-        if acro_lower in TECHNICAL_TERMS:
-            keywords.add(acro_lower)
-    
-    return keywords
-
-def compute_semantic_similarity(text1: str, text2: str) -> float:
+    for pattern, term in SPECIAL_PATTERNS:
+        offsets = [m.start() for m in pattern.finditer(text_lower)]
+        if offsets:
+            positions.setdefault(term, []).extend(offsets)
+    
+    # Uppercase acronyms in TECHNICAL_TERMS (e.g. "AWS") are already found by the
+    # lowercase term patterns above, so no separate acronym pass is needed
+    
+    return positions
+
+def extract_keywords(doc: Document) -> set:
+    """
+    Extract technical keywords from a parsed document
+    """
+    if doc.keyword_positions is None:
+        doc.keyword_positions = _locate_keywords(doc)
+    return set(doc.keyword_positions)
+
+def compute_semantic_similarity(doc1: Document, doc2: Document) -> float:
     """
-    Compute semantic similarity between two texts using sentence transformers
+    Compute semantic similarity between two documents using sentence transformers
     Returns similarity score between 0 and 1
     """
-    if not text1.strip() or not text2.strip():
+    if doc1.is_empty() or doc2.is_empty():
         return 0.0
     
-    embeddings = model.encode([text1, text2])
+    embeddings = model.encode([doc1.text, doc2.text])
     similarity = cosine_similarity([embeddings[0]], [embeddings[1]])[0][0]
     return float(similarity)
 
@@ -339,24 +376,24 @@ IMPORTANT: Return ONLY valid JSON. No markdown, no code blocks, no explanations.
         print(f"Gemini analysis error: {e}")
         return {"enabled": False, "error": str(e)}
 
-def extract_or_groups(text: str, all_keywords: set) -> list:
+# Pattern to match "X or Y" or "X, Y, or Z" where X, Y, Z are technical terms
+# Look for patterns like: "Python or Java", "C++ or C", "Linux/Android or RTOS"
+OR_PATTERNS = (
+    re.compile(r'\b(\w+(?:\s+\w+)?)\s+or\s+(\w+(?:\s+\w+)?)'),  # "X or Y"
+    re.compile(r'\b(\w+(?:\s+\w+)?)\s*/\s*(\w+(?:\s+\w+)?)\s+or\s+(\w+(?:\s+\w+)?)'),  # "X/Y or Z"
+    re.compile(r'\b(\w+(?:\s+\w+)?)\s*,\s*(\w+(?:\s+\w+)?)\s*,\s*or\s+(\w+(?:\s+\w+)?)'),  # "X, Y, or Z"
+)
+
+def extract_or_groups(doc: Document, all_keywords: set) -> list:
     """
     Extract groups of keywords connected by "or" (e.g., "Python or Java").
     Returns a list of sets, where each set contains alternative keywords.
     """
     or_groups = []
-    text_lower = text.lower()
-    
-    # Pattern to match "X or Y" or "X, Y, or Z" where X, Y, Z are technical terms
-    # Look for patterns like: "Python or Java", "C++ or C", "Linux/Android or RTOS"
-    or_patterns = [
-        r'\b(\w+(?:\s+\w+)?)\s+or\s+(\w+(?:\s+\w+)?)',  # "X or Y"
-        r'\b(\w+(?:\s+\w+)?)\s*/\s*(\w+(?:\s+\w+)?)\s+or\s+(\w+(?:\s+\w+)?)',  # "X/Y or Z"
-        r'\b(\w+(?:\s+\w+)?)\s*,\s*(\w+(?:\s+\w+)?)\s*,\s*or\s+(\w+(?:\s+\w+)?)',  # "X, Y, or Z"
-    ]
-    
-    for pattern in or_patterns:
-        for match in re.finditer(pattern, text_lower):
+    text_lower = doc.lower
+    
+    for pattern in OR_PATTERNS:
+        for match in pattern.finditer(text_lower):
             groups = match.groups()
             # Filter to only include keywords that are in our known technical terms
             group_keywords = set()
@@ -380,15 +417,15 @@ def extract_or_groups(text: str, all_keywords: set) -> list:
     
     # Also look for common "or" patterns with known technical terms
     # Find sentences/phrases with "or" and check if they contain multiple technical keywords
-    sentences = re.split(r'[.!?;]', text_lower)
-    for sentence in sentences:
+    for start, end in doc.sentences():
+        sentence = text_lower[start:end]
         if ' or ' in sentence or '/ or ' in sentence:
             # Extract all technical keywords from this sentence
             sentence_keywords = {kw for kw in all_keywords if kw in sentence}
             if len(sentence_keywords) >= 2:
                 # Check if they're connected by "or"
                 # Simple heuristic: if sentence has "or" and multiple keywords, they might be alternatives
-                words = sentence.split()
+                words = doc.tokens_between(start, end)
                 if 'or' in words:
                     or_groups.append(sentence_keywords)
     
@@ -467,25 +504,13 @@ def extract_text_from_pdf(file_content: bytes) -> str:
     
     return text
 
-@router.post("/analyze")
-async def analyze_resume(resume: UploadFile, job_text: str = Form(...)):
-    file_content = await resume.read()
-    file_extension = resume.filename.split('.')[-1].lower() if resume.filename else ''
-    
-    if file_extension == 'pdf':
-        resume_text = extract_text_from_pdf(file_content)
-    elif file_extension in ['txt', 'text']:
-        resume_text = file_content.decode("utf-8", errors="ignore")
-    else:
-        raise HTTPException(status_code=400, detail="Could not extract text from file")
-
-    # Keyword-based matching
-    resume_kw = extract_keywords(resume_text)
-    job_kw = extract_keywords(job_text)
-    or_groups = extract_or_groups(job_text, job_kw)
+def score_keywords(resume_kw: set, job_kw: set, or_groups: list) -> tuple:
+    """
+    Keyword coverage score, counting each "or" group as a single requirement.
+    Returns: (keyword_score, matched_keywords, missing_keywords)
+    """
     common, missing, matched_groups = match_with_or_groups(resume_kw, job_kw, or_groups)
     
-    # Calculate keyword score
     keywords_in_groups = set()
     for group in or_groups:
         keywords_in_groups.update(group)
@@ -494,18 +519,78 @@ async def analyze_resume(resume: UploadFile, job_text: str = Form(...)):
     matched_regular = len(common - keywords_in_groups)
     total_matched = matched_regular + len(matched_groups)
     keyword_score = int((total_matched / adjusted_total) * 100) if adjusted_total > 0 else 0
+    return keyword_score, common, missing
 
-    # Semantic similarity score
-    semantic_score = compute_semantic_similarity(resume_text, job_text) * 100
-    
-    # Gemini LLM analysis
-    gpt_analysis = analyze_with_gpt(resume_text, job_text)
+def combine_scores(semantic_score: float, keyword_score: int, gpt_analysis: dict) -> int:
+    """
+    Combined score (50% semantic, 30% keyword, 20% GPT if available)
+    """
+    # A repaired but truncated Gemini response may lack overall_score
+    if gpt_analysis.get("enabled") and isinstance(gpt_analysis.get("overall_score"), (int, float)):
+        return int(semantic_score * 0.5 + keyword_score * 0.3 + gpt_analysis["overall_score"] * 0.2)
+    return int(semantic_score * 0.7 + keyword_score * 0.3)
+
+async def read_resume_text(resume: UploadFile, priority: str, timings: dict) -> str:
+    file_content = await resume.read()
+    file_extension = resume.filename.split('.')[-1].lower() if resume.filename else ''
     
-    # Combined score (50% semantic, 30% keyword, 20% GPT if available)
-    if gpt_analysis.get("enabled"):
-        final_score = int(semantic_score * 0.5 + keyword_score * 0.3 + gpt_analysis["overall_score"] * 0.2)
-    else:
-        final_score = int(semantic_score * 0.7 + keyword_score * 0.3)
+    if file_extension == 'pdf':
+        stage_start = time.perf_counter()
+        resume_text = await admission.run_stage("pdf", priority, extract_text_from_pdf, file_content)
+        timings["pdf"] = (time.perf_counter() - stage_start) * 1000
+        return resume_text
+    if file_extension in ['txt', 'text']:
+        return file_content.decode("utf-8", errors="ignore")
+    raise HTTPException(status_code=400, detail="Could not extract text from file")
+
+async def run_llm_analysis(priority: str, resume_text: str, job_text: str) -> dict:
+    """
+    Gemini LLM analysis - when the LLM stage is saturated, fall back to
+    keyword + semantic scoring rather than failing the whole request
+    """
+    if not LLM_ENABLED:
+        return analyze_with_gpt(resume_text, job_text)
+    try:
+        return await admission.run_stage("llm", priority, analyze_with_gpt, resume_text, job_text)
+    except admission.Overloaded as e:
+        return {"enabled": False, "error": e.detail}
+
+def server_timing(timings: dict) -> str:
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings.items())
+
+@router.post("/analyze")
+async def analyze_resume(request: Request, response: Response, resume: UploadFile, job_text: str = Form(...)):
+    # Blocking stages run in the threadpool, each under its own concurrency limit
+    priority = admission.request_priority(request)
+    # Per-stage wall time in ms (including queue wait), reported via Server-Timing
+    timings = {}
+    resume_text = await read_resume_text(resume, priority, timings)
+
+    # Parse each text once; every stage below works off these documents
+    stage_start = time.perf_counter()
+    resume_doc = parse_document(resume_text)
+    job_doc = parse_document(job_text)
+
+    # Keyword-based matching
+    resume_kw = extract_keywords(resume_doc)
+    job_kw = extract_keywords(job_doc)
+    or_groups = extract_or_groups(job_doc, job_kw)
+    keyword_score, common, missing = score_keywords(resume_kw, job_kw, or_groups)
+    timings["keywords"] = (time.perf_counter() - stage_start) * 1000
+
+    # Semantic similarity score
+    stage_start = time.perf_counter()
+    semantic_score = await admission.run_stage(
+        "embedding", priority, compute_semantic_similarity, resume_doc, job_doc
+    ) * 100
+    timings["embedding"] = (time.perf_counter() - stage_start) * 1000
+    
+    stage_start = time.perf_counter()
+    gpt_analysis = await run_llm_analysis(priority, resume_doc.text, job_doc.text)
+    timings["llm"] = (time.perf_counter() - stage_start) * 1000
+    response.headers["Server-Timing"] = server_timing(timings)
+    
+    final_score = combine_scores(semantic_score, keyword_score, gpt_analysis)
 
     return {
         "match_score": final_score,
@@ -516,4 +601,164 @@ async def analyze_resume(resume: UploadFile, job_text: str = Form(...)):
         "matched_keywords": sorted(list(common)),
         "job_keywords": sorted(list(job_kw)),
         "resume_keywords": sorted(list(resume_kw)),
-    }
\ No newline at end of file
+    }
+
+def encode_texts(texts: list):
+    """
+    Batch-encode texts into unit-length embeddings
+    """
+    return model.encode(texts, normalize_embeddings=True)
+
+@router.post("/reanalyze")
+async def reanalyze_resume(
+    request: Request,
+    response: Response,
+    resume: UploadFile,
+    job_text: str = Form(...),
+    session_id: Optional[str] = Form(None),
+):
+    """
+    Incremental re-analysis for edit-and-rescore loops.
+    The resume is split into sections and chunk embeddings are cached per section
+    content, so only edited sections are re-embedded. Gemini is re-called only when
+    the fraction changed since the version it last scored reaches REANALYZE_LLM_THRESHOLD.
+    The semantic score here compares the length-weighted mean of section embeddings
+    with the job embedding, so it is comparable within a session but not to /analyze.
+    """
+    priority = admission.request_priority(request)
+    timings = {}
+    resume_text = await read_resume_text(resume, priority, timings)
+
+    session = sessions.get(session_id) if session_id else None
+    if session is None:
+        session = sessions.create()
+
+    # Overlapping requests on one session would read and overwrite each other's
+    # job and section state across the awaits below, so they run one at a time
+    async with session.lock:
+        result, changes = await _reanalyze_session(session, priority, resume_text, job_text, timings)
+    response.headers["Server-Timing"] = server_timing(timings)
+
+    return {**result, "session_id": session.session_id, "changes": changes}
+
+async def _reanalyze_session(session, priority: str, resume_text: str, job_text: str, timings: dict) -> tuple:
+    """
+    Score a new resume version against the session's cached state and update it.
+    Returns: (result, changes)
+    """
+    # Job side is computed once per session and job text
+    stage_start = time.perf_counter()
+    job_hash = text_hash(job_text)
+    if session.job_hash != job_hash:
+        job_doc = parse_document(job_text)
+        job_kw = extract_keywords(job_doc)
+        or_groups = extract_or_groups(job_doc, job_kw)
+        job_embedding = (await admission.run_stage("embedding", priority, encode_texts, [job_doc.text]))[0]
+        session.reset_job(job_hash, job_kw, or_groups, job_embedding)
+
+    # Keywords come from one pass over the whole resume, so they match /analyze exactly;
+    # only the section embeddings are cached
+    resume_doc = parse_document(resume_text)
+    resume_kw = extract_keywords(resume_doc)
+
+    # Diff the new version's sections against the cached ones by content hash.
+    # A section repeated in the resume is embedded once but weighted per occurrence.
+    chars = Counter()
+    changed = {}
+    for index, (title, _, _) in enumerate(resume_doc.sections):
+        section_text = resume_doc.section_text(index)
+        if not section_text.strip():
+            continue
+        key = text_hash(section_text)
+        chars[key] += len(section_text)
+        if key not in session.sections and key not in changed:
+            changed[key] = (title, section_text)
+
+    previous = session.sections
+    change_ratio = _changed_fraction(chars, len(resume_text), session.section_chars, session.text_length)
+    new_states = {key: SectionState(title, None) for key, (title, _) in changed.items()}
+    timings["keywords"] = (time.perf_counter() - stage_start) * 1000
+
+    stage_start = time.perf_counter()
+    if changed:
+        embeddings = await admission.run_stage(
+            "embedding", priority, encode_texts, [section_text for _, section_text in changed.values()]
+        )
+        for key, embedding in zip(changed, embeddings):
+            new_states[key].embedding = embedding
+    sections = {key: new_states[key] if key in new_states else previous[key] for key in chars}
+    timings["embedding"] = (time.perf_counter() - stage_start) * 1000
+
+    # Scores from the cached and recomputed sections
+    keyword_score, common, missing = score_keywords(resume_kw, session.job_keywords, session.or_groups)
+
+    if sections:
+        keys = list(sections)
+        weights = np.array([chars[key] for key in keys], dtype=np.float32)
+        resume_embedding = weights @ np.stack([sections[key].embedding for key in keys]) / weights.sum()
+        norm = np.linalg.norm(resume_embedding)
+        semantic_score = float(resume_embedding @ session.job_embedding / norm) * 100 if norm > 0 else 0.0
+    else:
+        semantic_score = 0.0
+
+    stage_start = time.perf_counter()
+    # Drift is measured from the version Gemini last scored, so small edits that
+    # add up across versions still trigger a re-run
+    llm_change_ratio = _changed_fraction(chars, len(resume_text), session.llm_section_chars, session.llm_text_length)
+    llm_rerun = session.gpt_analysis is None or llm_change_ratio >= settings.REANALYZE_LLM_THRESHOLD
+    if llm_rerun:
+        gpt_analysis = await run_llm_analysis(priority, resume_text, job_text)
+        if gpt_analysis.get("enabled"):
+            session.gpt_analysis = gpt_analysis
+            session.llm_section_chars = chars
+            session.llm_text_length = len(resume_text)
+    else:
+        gpt_analysis = dict(session.gpt_analysis, reused=True)
+    timings["llm"] = (time.perf_counter() - stage_start) * 1000
+
+    result = {
+        "match_score": combine_scores(semantic_score, keyword_score, gpt_analysis),
+        "semantic_score": round(semantic_score, 1),
+        "keyword_score": keyword_score,
+        "gpt_analysis": gpt_analysis,
+        "missing_keywords": sorted(list(missing)),
+        "matched_keywords": sorted(list(common)),
+        "job_keywords": sorted(list(session.job_keywords)),
+        "resume_keywords": sorted(list(resume_kw)),
+    }
+
+    previous_result = session.result
+    previous_kw = set(previous_result["resume_keywords"]) if previous_result else set()
+    changed_titles = {title or "(header)" for title, _ in changed.values()}
+    # Edited sections show up as changed; dropped sections with no new content under the same title as removed
+    removed_titles = {previous[key].title or "(header)" for key in previous.keys() - chars.keys()} - changed_titles
+    changes = {
+        "first_version": previous_result is None,
+        "sections_changed": sorted(changed_titles),
+        "sections_removed": sorted(removed_titles),
+        "sections_reused": len(chars.keys() & previous.keys()),
+        "change_ratio": round(change_ratio, 3),
+        "llm_change_ratio": round(llm_change_ratio, 3),
+        "llm_rerun": llm_rerun,
+        "keywords_added": sorted(resume_kw - previous_kw) if previous_result else [],
+        "keywords_removed": sorted(previous_kw - resume_kw) if previous_result else [],
+        "score_delta": {
+            name: round(result[name] - previous_result[name], 1) if previous_result else None
+            for name in ("match_score", "semantic_score", "keyword_score")
+        },
+    }
+
+    session.sections = sections
+    session.section_chars = chars
+    session.text_length = len(resume_text)
+    session.result = result
+    sessions.touch(session)
+    return result, changes
+
+def _changed_fraction(chars: Counter, text_length: int, base_chars: Counter, base_length: int) -> float:
+    """
+    Fraction of two versions' text that differs, from per-section character counts.
+    Edited sections count on both sides, so a full rewrite is 1.0.
+    """
+    changed = sum(abs(chars[key] - base_chars[key]) for key in chars.keys() | base_chars.keys())
+    return changed / max(text_length + base_length, 1)
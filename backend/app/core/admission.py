@@ -0,0 +1,199 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+# Priority classes, lower rank is served first
+PRIORITIES = {"interactive": 0, "bulk": 1}
+DEFAULT_PRIORITY = "interactive"
+PRIORITY_HEADER = "x-priority"
+
+
+class Overloaded(HTTPException):
+    """
+    Raised when a request is shed instead of queued.
+    Interactive requests get a 503 (server busy), bulk requests a 429 (back off).
+    """
+    def __init__(self, stage: str, priority: str, reason: str):
+        status_code = 429 if priority == "bulk" else 503
+        super().__init__(
+            status_code=status_code,
+            detail=f"Server busy ({stage}: {reason}), please retry later",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+        self.stage = stage
+
+
+class StageLimiter:
+    """
+    Concurrency limit with a bounded priority wait queue for one processing stage.
+    Bulk requests may only fill part of the queue, and an interactive request that
+    finds the queue full evicts the newest bulk waiter, so interactive ones are shed last.
+    """
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float, bulk_queue_share: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.bulk_queue_size = int(max_queue * bulk_queue_share)
+        self.active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+        self.admitted = {p: 0 for p in PRIORITIES}
+        self.shed = {p: 0 for p in PRIORITIES}
+
+    def _reject(self, priority: str, reason: str):
+        self.shed[priority] += 1
+        raise Overloaded(self.name, priority, reason)
+
+    async def acquire(self, priority: str):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted[priority] += 1
+            return
+
+        queue_size = self.max_queue if priority == "interactive" else self.bulk_queue_size
+        if len(self._waiters) >= queue_size and not (priority == "interactive" and self._evict_bulk_waiter()):
+            self._reject(priority, "queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (PRIORITIES[priority], next(self._counter), future)
+        heapq.heappush(self._waiters, entry)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as we gave up - pass it on
+                self.release()
+            else:
+                future.cancel()
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self._reject(priority, "queue timeout")
+        self.admitted[priority] += 1
+
+    def _evict_bulk_waiter(self) -> bool:
+        """Shed the most recently queued bulk waiter to make room. Returns False if there is none."""
+        bulk_rank = PRIORITIES["bulk"]
+        bulk_entries = [entry for entry in self._waiters if entry[0] == bulk_rank and not entry[2].done()]
+        if not bulk_entries:
+            return False
+        entry = max(bulk_entries, key=lambda item: item[1])
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
+        self.shed["bulk"] += 1
+        # The evicted waiter's acquire() raises this instead of getting a slot
+        entry[2].set_exception(Overloaded(self.name, "bulk", "evicted by interactive request"))
+        return True
+
+    def release(self):
+        # Hand the slot straight to the highest-priority waiter, if any
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: str):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queue_depth": len(self._waiters),
+            "max_queue": self.max_queue,
+            "admitted": dict(self.admitted),
+            "shed": dict(self.shed),
+        }
+
+
+def _limiter(name: str, limit: int, max_queue: int, queue_timeout: float) -> StageLimiter:
+    return StageLimiter(
+        name,
+        limit=limit,
+        max_queue=max_queue,
+        queue_timeout=queue_timeout,
+        bulk_queue_share=settings.BULK_QUEUE_SHARE,
+    )
+
+# "analyze" gates whole requests in the middleware; the rest gate individual stages.
+# Stage limit + queue is kept below MAX_CONCURRENT_ANALYSES so stage queues can fill
+# and shed, and stage timeouts are short because a waiting request holds its analyze slot.
+limiters = {
+    "analyze": _limiter(
+        "analyze", settings.MAX_CONCURRENT_ANALYSES, settings.ANALYZE_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT
+    ),
+    "pdf": _limiter("pdf", settings.PDF_CONCURRENCY, settings.STAGE_QUEUE_SIZE, settings.STAGE_QUEUE_TIMEOUT),
+    "embedding": _limiter(
+        "embedding", settings.EMBEDDING_CONCURRENCY, settings.STAGE_QUEUE_SIZE, settings.STAGE_QUEUE_TIMEOUT
+    ),
+    "llm": _limiter("llm", settings.LLM_CONCURRENCY, settings.LLM_QUEUE_SIZE, settings.LLM_QUEUE_TIMEOUT),
+}
+
+
+def parse_priority(value) -> str:
+    value = (value or "").strip().lower()
+    return value if value in PRIORITIES else DEFAULT_PRIORITY
+
+
+def request_priority(request) -> str:
+    return request.scope.get("state", {}).get("priority", DEFAULT_PRIORITY)
+
+
+async def run_stage(stage: str, priority: str, func, *args):
+    """
+    Run a blocking stage function in the threadpool under that stage's limit.
+    Raises Overloaded if the stage queue is full or the wait times out.
+    """
+    async with limiters[stage].slot(priority):
+        return await run_in_threadpool(func, *args)
+
+
+def stats() -> dict:
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that admits or sheds analysis requests before the upload is read.
+    The priority class comes from the X-Priority header (interactive or bulk).
+    """
+    def __init__(self, app, paths=("/api/analyze", "/api/reanalyze")):
+        self.app = app
+        self.paths = set(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        priority = parse_priority(headers.get(PRIORITY_HEADER.encode(), b"").decode("latin-1"))
+        scope.setdefault("state", {})["priority"] = priority
+
+        try:
+            await limiters["analyze"].acquire(priority)
+        except Overloaded as e:
+            response = JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiters["analyze"].release()
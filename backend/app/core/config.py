@@ -6,6 +6,27 @@ load_dotenv()
 class Settings:
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")  # Using mini for cost efficiency
+
+    # Admission control for /api/analyze
+    MAX_CONCURRENT_ANALYSES: int = int(os.getenv("MAX_CONCURRENT_ANALYSES", "8"))
+    ANALYZE_QUEUE_SIZE: int = int(os.getenv("ANALYZE_QUEUE_SIZE", "32"))
+    PDF_CONCURRENCY: int = int(os.getenv("PDF_CONCURRENCY", "4"))
+    EMBEDDING_CONCURRENCY: int = int(os.getenv("EMBEDDING_CONCURRENCY", "2"))  # Single shared MiniLM instance
+    LLM_CONCURRENCY: int = int(os.getenv("LLM_CONCURRENCY", "4"))  # Bounded by the Gemini quota
+    # Stage limit + queue size must stay below MAX_CONCURRENT_ANALYSES (PDF: 4 + 3 < 8), or the
+    # stage queue can never fill and only sheds after STAGE_QUEUE_TIMEOUT
+    STAGE_QUEUE_SIZE: int = int(os.getenv("STAGE_QUEUE_SIZE", "3"))
+    LLM_QUEUE_SIZE: int = int(os.getenv("LLM_QUEUE_SIZE", "2"))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))  # Seconds a request may wait
+    STAGE_QUEUE_TIMEOUT: float = float(os.getenv("STAGE_QUEUE_TIMEOUT", "3"))  # Per stage, while holding a request slot
+    LLM_QUEUE_TIMEOUT: float = float(os.getenv("LLM_QUEUE_TIMEOUT", "1"))  # Short: saturation falls back to no-LLM scoring
+    BULK_QUEUE_SHARE: float = float(os.getenv("BULK_QUEUE_SHARE", "0.5"))  # Fraction of each queue bulk may use
+    ADMISSION_RETRY_AFTER: int = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+    # Incremental re-analysis sessions for /api/reanalyze
+    MAX_SESSIONS: int = int(os.getenv("MAX_SESSIONS", "1000"))
+    SESSION_TTL_SECONDS: float = float(os.getenv("SESSION_TTL_SECONDS", "1800"))
+    REANALYZE_LLM_THRESHOLD: float = float(os.getenv("REANALYZE_LLM_THRESHOLD", "0.15"))  # Changed fraction that re-runs Gemini
     
 settings = Settings()
 
@@ -0,0 +1,97 @@
+import re
+from array import array
+from bisect import bisect_left
+
+# Tokens never cross sentence delimiters, so the tokens inside a sentence span
+# are exactly what `sentence.split()` would return for that sentence
+TOKEN_RE = re.compile(r'[^\s.!?;]+')
+SENTENCE_DELIMITER_RE = re.compile(r'[.!?;]')
+
+# Section headers: short lines like "EXPERIENCE", "Education:", "SKILLS:" or "Work Experience"
+SECTION_HEADER_RE = re.compile(r'^[ \t]*([A-Za-z][A-Za-z &/\-]{1,38}):?[ \t]*$', re.MULTILINE)
+# Title Case lines only count as headers if they name a usual resume section,
+# so names and job titles ("Jane Doe", "Senior Engineer") don't split sections
+SECTION_WORDS = frozenset({
+    "summary", "profile", "objective", "experience", "employment", "history", "education",
+    "skills", "projects", "certifications", "training", "publications", "awards", "honors",
+    "achievements", "languages", "interests", "activities", "volunteering", "courses",
+    "qualifications", "references", "competencies",
+})
+
+
+class Document:
+    """
+    Parse-once representation of a resume or job text shared by all scoring stages.
+
+    Token, sentence, section and keyword offsets are character positions that index
+    both `text` and `lower` (the normalized text, kept the same length). Boundaries
+    are stored in flat arrays to keep per-request allocations small.
+    """
+    __slots__ = ("text", "lower", "token_starts", "token_ends", "sentence_offsets", "sections", "keyword_positions")
+
+    def __init__(self, text: str):
+        self.text = text or ""
+        self.lower = self.text.lower()
+        if len(self.lower) != len(self.text):
+            # A few characters lowercase to two (e.g. "İ" -> "i" + combining dot); keep
+            # only the first so offsets line up with `text`
+            self.lower = ''.join(c.lower()[0] for c in self.text)
+        self.token_starts = array('I')
+        self.token_ends = array('I')
+        self.sentence_offsets = array('I')
+        self.sections = []
+        # Filled in by keyword extraction: term -> list of match offsets
+        self.keyword_positions = None
+
+        for match in TOKEN_RE.finditer(self.lower):
+            self.token_starts.append(match.start())
+            self.token_ends.append(match.end())
+
+        start = 0
+        for match in SENTENCE_DELIMITER_RE.finditer(self.lower):
+            self.sentence_offsets.extend((start, match.start()))
+            start = match.end()
+        self.sentence_offsets.extend((start, len(self.lower)))
+
+        self.sections = self._find_sections()
+
+    def _find_sections(self) -> list:
+        """
+        Split the text into (title, start, end) sections at header-looking lines.
+        Text before the first header belongs to an untitled section.
+        """
+        headers = []
+        for match in SECTION_HEADER_RE.finditer(self.text):
+            title = match.group(1).strip()
+            # All-caps lines, lines ending with ":" and Title Case section names count as headers
+            if (title.isupper() or match.group(0).rstrip().endswith(':')
+                    or (title.istitle() and not SECTION_WORDS.isdisjoint(title.lower().split()))):
+                headers.append((title.lower(), match.start()))
+
+        sections = []
+        start, title = 0, ""
+        for header_title, header_start in headers:
+            if header_start > start or title:
+                sections.append((title, start, header_start))
+            title, start = header_title, header_start
+        sections.append((title, start, len(self.text)))
+        return sections
+
+    def is_empty(self) -> bool:
+        return not self.text.strip()
+
+    def sentences(self):
+        """Yield (start, end) offsets of each sentence in the normalized text."""
+        offsets = self.sentence_offsets
+        for i in range(0, len(offsets), 2):
+            yield offsets[i], offsets[i + 1]
+
+    def tokens_between(self, start: int, end: int) -> list:
+        """Return the normalized tokens that fall inside [start, end)."""
+        first = bisect_left(self.token_starts, start)
+        last = bisect_left(self.token_starts, end, first)
+        return [self.lower[self.token_starts[i]:self.token_ends[i]] for i in range(first, last)]
+
+    def section_text(self, index: int) -> str:
+        _, start, end = self.sections[index]
+        return self.text[start:end]
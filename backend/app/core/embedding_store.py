@@ -0,0 +1,247 @@
+import hashlib
+import json
+from pathlib import Path
+
+import numpy as np
+
+DTYPES = ("float16", "int8")
+DEFAULT_DIM = 384
+DEFAULT_DTYPE = "float16"
+# Rows are scored in chunks so int8/float16 rows are widened a slice at a time
+SIMILARITY_CHUNK_ROWS = 65536
+
+
+def id_hash(item_id: str) -> int:
+    """Stable 64-bit hash of an ID, the same in every process (unlike hash())."""
+    return int.from_bytes(hashlib.blake2b(item_id.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class EmbeddingStore:
+    """
+    Append-only, memory-mapped store of unit-length embeddings keyed by string ID.
+
+    Vectors are kept as float16, or int8 with a float32 scale per row, in a flat
+    file that worker processes map read-only and share through the page cache.
+    Similarity is a dot product, i.e. cosine for the normalized MiniLM vectors
+    from `encode_texts` in routes_resume. One process writes; any number read.
+    Re-adding an ID appends a new row and the latest row wins.
+
+    IDs and their hashes are memory-mapped as well. Each reader only builds a
+    sort order over the hashes plus row offsets, about 25 bytes per row, rather
+    than a Python dict of every ID.
+
+    Directory layout: meta.json (dim, dtype), vectors.bin, scales.bin (int8 only),
+    hashes.bin (uint64 `id_hash` per row) and ids.txt (one ID per line, in row order).
+    """
+    def __init__(self, path, dim: int = None, dtype: str = None):
+        self.path = Path(path)
+        meta_path = self.path / "meta.json"
+        if meta_path.exists():
+            meta = json.loads(meta_path.read_text())
+            if dim is not None and dim != meta["dim"]:
+                raise ValueError(f"Store at {self.path} has dim {meta['dim']}, got {dim}")
+            if dtype is not None and dtype != meta["dtype"]:
+                raise ValueError(f"Store at {self.path} has dtype {meta['dtype']!r}, got {dtype!r}")
+            dim, dtype = meta["dim"], meta["dtype"]
+        else:
+            dim = DEFAULT_DIM if dim is None else dim
+            dtype = DEFAULT_DTYPE if dtype is None else dtype
+            if dtype not in DTYPES:
+                raise ValueError(f"dtype must be one of {DTYPES}, got {dtype!r}")
+            self.path.mkdir(parents=True, exist_ok=True)
+            meta_path.write_text(json.dumps({"dim": dim, "dtype": dtype}))
+        self.dim = dim
+        self.dtype = dtype
+        self._vectors_path = self.path / "vectors.bin"
+        self._scales_path = self.path / "scales.bin"
+        self._hashes_path = self.path / "hashes.bin"
+        self._ids_path = self.path / "ids.txt"
+        self._row_bytes = dim * np.dtype(dtype).itemsize
+        # Offset of the "\n" ending each complete line of ids.txt seen so far
+        self._id_ends = np.zeros(0, dtype=np.int64)
+        self._ids_buffer = None
+        self._vectors = None
+        self._scales = None
+        self._mapped_rows = 0
+        # Rows ordered by (hash, row), the hashes in that order, and which rows are the latest for their ID
+        self._order = np.zeros(0, dtype=np.int64)
+        self._sorted_hashes = np.zeros(0, dtype=np.uint64)
+        self._latest = np.zeros(0, dtype=bool)
+        self._live_rows = 0
+        self.refresh()
+
+    def __len__(self):
+        return self._live_rows
+
+    def __contains__(self, item_id):
+        return self._find(item_id) is not None
+
+    @property
+    def rows(self) -> int:
+        """Number of stored rows, including rows superseded by a re-add."""
+        return self._mapped_rows
+
+    @property
+    def ids(self) -> list:
+        """
+        ID of every row in row order, i.e. of each column returned by `similarity()`.
+        A re-added ID appears once per row. Builds a list of all IDs, so it costs
+        O(rows) memory; use `row_id()` for a few rows.
+        """
+        if not self._mapped_rows:
+            return []
+        end = int(self._id_ends[self._mapped_rows - 1])
+        return bytes(self._ids_buffer[:end]).decode("utf-8").split("\n")
+
+    def row_id(self, row: int) -> str:
+        start = int(self._id_ends[row - 1]) + 1 if row else 0
+        return bytes(self._ids_buffer[start:int(self._id_ends[row])]).decode("utf-8")
+
+    def _file_rows(self) -> int:
+        rows = self._vectors_path.stat().st_size // self._row_bytes if self._vectors_path.exists() else 0
+        rows = min(rows, self._hashes_path.stat().st_size // 8 if self._hashes_path.exists() else 0)
+        if self.dtype == "int8":
+            rows = min(rows, self._scales_path.stat().st_size // 4 if self._scales_path.exists() else 0)
+        return rows
+
+    def refresh(self):
+        """Pick up rows appended since the last call (cheap when nothing changed)."""
+        scanned = int(self._id_ends[-1]) + 1 if len(self._id_ends) else 0
+        if self._ids_path.exists() and self._ids_path.stat().st_size > scanned:
+            with open(self._ids_path, "rb") as f:
+                f.seek(scanned)
+                tail = np.frombuffer(f.read(), dtype=np.uint8)
+            # A trailing ID without its "\n" is still being written and isn't counted.
+            # Only complete lines are mapped, as the next append may truncate a torn tail.
+            new_ends = np.flatnonzero(tail == ord("\n")) + scanned
+            if len(new_ends):
+                self._id_ends = np.concatenate([self._id_ends, new_ends])
+                self._ids_buffer = np.memmap(self._ids_path, dtype=np.uint8, mode="r", shape=(int(new_ends[-1]) + 1,))
+
+        # IDs are written last, so a row counts once its vector, scale, hash and ID are all present
+        rows = min(len(self._id_ends), self._file_rows())
+        if rows == self._mapped_rows:
+            return
+        self._vectors = np.memmap(self._vectors_path, dtype=self.dtype, mode="r", shape=(rows, self.dim))
+        if self.dtype == "int8":
+            self._scales = np.memmap(self._scales_path, dtype=np.float32, mode="r", shape=(rows,))
+        hashes = np.memmap(self._hashes_path, dtype=np.uint64, mode="r", shape=(rows,))
+        self._mapped_rows = rows
+        self._build_index(hashes)
+
+    def _build_index(self, hashes: np.ndarray):
+        rows = len(hashes)
+        self._order = np.argsort(hashes, kind="stable")
+        self._sorted_hashes = np.asarray(hashes[self._order])
+        # The last row of each run of equal hashes is the latest row for its ID
+        last_of_run = np.ones(rows, dtype=bool)
+        last_of_run[:-1] = self._sorted_hashes[:-1] != self._sorted_hashes[1:]
+        self._latest = np.zeros(rows, dtype=bool)
+        self._latest[self._order[last_of_run]] = True
+        # Earlier rows in a run are superseded unless their ID differs (a hash collision);
+        # walk each run from its newest row, keeping the IDs already seen
+        run_end, seen = None, set()
+        for position in np.flatnonzero(~last_of_run)[::-1]:
+            end = int(np.searchsorted(self._sorted_hashes, self._sorted_hashes[position], side="right"))
+            if end != run_end:
+                run_end, seen = end, {self.row_id(int(self._order[end - 1]))}
+            row = int(self._order[position])
+            item_id = self.row_id(row)
+            if item_id not in seen:
+                self._latest[row] = True
+                seen.add(item_id)
+        self._live_rows = int(self._latest.sum())
+
+    def _find(self, item_id: str):
+        """Latest row for an ID, or None."""
+        target = np.uint64(id_hash(item_id))
+        first = int(np.searchsorted(self._sorted_hashes, target, side="left"))
+        last = int(np.searchsorted(self._sorted_hashes, target, side="right"))
+        # Rows with equal hashes are in row order, so search from the newest
+        for position in range(last - 1, first - 1, -1):
+            row = int(self._order[position])
+            if self.row_id(row) == item_id:
+                return row
+        return None
+
+    def _quantize(self, vectors: np.ndarray) -> tuple:
+        if self.dtype == "float16":
+            return vectors.astype(np.float16), None
+        scales = np.abs(vectors).max(axis=1) / 127
+        scales[scales == 0] = 1.0
+        quantized = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+
+    def add(self, ids: list, vectors):
+        """Append embeddings for the given IDs. Vectors are normalized before storing."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(ids) != len(vectors):
+            raise ValueError(f"Got {len(ids)} IDs for {len(vectors)} vectors")
+        for item_id in ids:
+            if not item_id or "\n" in item_id:
+                raise ValueError(f"Invalid embedding ID: {item_id!r}")
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+        quantized, scales = self._quantize(vectors)
+        hashes = np.array([id_hash(item_id) for item_id in ids], dtype=np.uint64)
+
+        self.refresh()
+        rows = self._mapped_rows
+        ids_offset = int(self._id_ends[rows - 1]) + 1 if rows else 0
+        # Drop any partial tail from an interrupted append before writing
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * self._row_bytes)
+            f.write(quantized.tobytes())
+        if scales is not None:
+            with open(self._scales_path, "ab") as f:
+                f.truncate(rows * 4)
+                f.write(scales.tobytes())
+        with open(self._hashes_path, "ab") as f:
+            f.truncate(rows * 8)
+            f.write(hashes.tobytes())
+        self._id_ends = self._id_ends[:rows]
+        with open(self._ids_path, "ab") as f:
+            f.truncate(ids_offset)
+            f.write("".join(item_id + "\n" for item_id in ids).encode("utf-8"))
+        self.refresh()
+
+    def _rows(self, start: int, stop: int) -> np.ndarray:
+        block = np.asarray(self._vectors[start:stop], dtype=np.float32)
+        if self._scales is not None:
+            block *= self._scales[start:stop, None]
+        return block
+
+    def get(self, item_id: str) -> np.ndarray:
+        row = self._find(item_id)
+        if row is None:
+            raise KeyError(item_id)
+        return self._rows(row, row + 1)[0]
+
+    def similarity(self, query) -> np.ndarray:
+        """
+        Dot-product similarity of every stored row with a unit-length query vector.
+        A (queries, dim) matrix gives a (queries, rows) result in the same pass.
+        Column i belongs to `ids[i]`; rows superseded by a re-add score -inf.
+        """
+        self.refresh()
+        queries = np.asarray(query, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = queries.reshape(-1, self.dim)
+        scores = np.empty((len(queries), self._mapped_rows), dtype=np.float32)
+        for start in range(0, self._mapped_rows, SIMILARITY_CHUNK_ROWS):
+            stop = min(start + SIMILARITY_CHUNK_ROWS, self._mapped_rows)
+            scores[:, start:stop] = queries @ self._rows(start, stop).T
+        if self._live_rows < self._mapped_rows:
+            scores[:, ~self._latest] = -np.inf
+        return scores[0] if single else scores
+
+    def top_k(self, query, k: int = 10) -> list:
+        """The k most similar IDs as (id, score), skipping rows superseded by a re-add."""
+        scores = self.similarity(query)
+        k = min(k, self._live_rows)
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(self.row_id(int(row)), float(scores[row])) for row in best]
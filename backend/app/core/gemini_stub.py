@@ -0,0 +1,68 @@
+import json
+import os
+import random
+import time
+from types import SimpleNamespace
+
+
+class StubGeminiClient:
+    """
+    Local stand-in for `genai.Client` used for load testing.
+    Mimics `client.models.generate_content(...)` with configurable latency and
+    a configurable rate of malformed (truncated or non-JSON) responses.
+    """
+    def __init__(self, latency_ms: float = 800.0, jitter_ms: float = 200.0,
+                 malformed_rate: float = 0.0, error_rate: float = 0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.malformed_rate = malformed_rate
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            latency_ms=float(os.getenv("GEMINI_STUB_LATENCY_MS", "800")),
+            jitter_ms=float(os.getenv("GEMINI_STUB_JITTER_MS", "200")),
+            malformed_rate=float(os.getenv("GEMINI_STUB_MALFORMED_RATE", "0")),
+            error_rate=float(os.getenv("GEMINI_STUB_ERROR_RATE", "0")),
+        )
+
+    def generate_content(self, model: str, contents: str, config=None):
+        delay = max(0.0, self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms))
+        time.sleep(delay / 1000)
+
+        roll = self._random.random()
+        if roll < self.error_rate:
+            raise RuntimeError("Stub Gemini error: 429 RESOURCE_EXHAUSTED")
+        if roll < self.error_rate + self.malformed_rate:
+            return SimpleNamespace(text=self._malformed_response())
+        return SimpleNamespace(text=json.dumps(self._analysis()))
+
+    def _analysis(self) -> dict:
+        scores = {
+            "technical_skills": self._random.randint(40, 95),
+            "experience_level": self._random.randint(40, 95),
+            "education": self._random.randint(40, 95),
+            "domain_knowledge": self._random.randint(40, 95),
+            "overall_fit": self._random.randint(40, 95),
+        }
+        scores["overall_score"] = sum(scores.values()) // len(scores)
+        return {
+            **scores,
+            "strengths": ["Relevant languages", "Project experience", "Education"],
+            "gaps": ["Missing some tools", "Limited industry exposure"],
+            "recommendation": "GOOD_MATCH",
+            "summary": "Stub analysis generated for load testing.",
+        }
+
+    def _malformed_response(self) -> str:
+        content = json.dumps(self._analysis())
+        kind = self._random.choice(("truncated", "markdown", "prose"))
+        if kind == "truncated":
+            # Cut mid-string, like a response that hit max_output_tokens
+            return content[:self._random.randint(20, len(content) - 20)]
+        if kind == "markdown":
+            return "Here is the analysis:\n```json\n" + content.replace('",', '"') + "\n```"
+        return "I'm sorry, I can't evaluate this resume right now."
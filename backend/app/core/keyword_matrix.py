@@ -0,0 +1,95 @@
+import numpy as np
+from scipy import sparse
+
+
+class KeywordCoverageIndex:
+    """
+    Job-side sparse term matrices for scoring many resumes against many jobs at once.
+
+    Gives the same keyword_score as `score_keywords` in routes_resume for every
+    resume/job pair. Each "or" group is its own column: a group is matched when both
+    the resume and the job have any of its keywords, and counts as a single
+    requirement in the adjusted total.
+    """
+    def __init__(self, job_keywords: list, job_or_groups: list):
+        self.n_jobs = len(job_keywords)
+        # Only job terms can affect the score, so they form the whole vocabulary
+        terms = set().union(*job_keywords, *(group for or_groups in job_or_groups for group in or_groups))
+        self.vocabulary = {term: i for i, term in enumerate(sorted(terms))}
+
+        regular_rows, regular_cols = [], []
+        group_rows, group_cols = [], []
+        # (group column, job) pairs; a group only counts if one of its keywords is in the job
+        group_jobs = []
+        n_groups = 0
+        adjusted_total = np.zeros(self.n_jobs, dtype=np.int64)
+        for j, (keywords, or_groups) in enumerate(zip(job_keywords, job_or_groups)):
+            keywords_in_groups = set()
+            for group in or_groups:
+                keywords_in_groups.update(group)
+                group_column = n_groups
+                n_groups += 1
+                if not group.isdisjoint(keywords):
+                    group_jobs.append((group_column, j))
+                for term in group:
+                    group_rows.append(self.vocabulary[term])
+                    group_cols.append(group_column)
+            for term in keywords - keywords_in_groups:
+                regular_rows.append(self.vocabulary[term])
+                regular_cols.append(j)
+            adjusted_total[j] = len(keywords) - len(keywords_in_groups) + len(or_groups)
+
+        n_terms = len(self.vocabulary)
+        # terms x jobs: keywords outside any "or" group
+        self.regular = sparse.csr_matrix(
+            (np.ones(len(regular_rows), dtype=np.int32), (regular_rows, regular_cols)),
+            shape=(n_terms, self.n_jobs),
+        )
+        # terms x groups: "or" group membership (deduplicated to binary)
+        self.groups = sparse.csr_matrix(
+            (np.ones(len(group_rows), dtype=np.int32), (group_rows, group_cols)),
+            shape=(n_terms, n_groups),
+        )
+        self.groups.data[:] = 1
+        # groups x jobs: which job each group column belongs to
+        self.group_jobs = sparse.csr_matrix(
+            (
+                np.ones(len(group_jobs), dtype=np.int32),
+                ([column for column, _ in group_jobs], [j for _, j in group_jobs]),
+            ),
+            shape=(n_groups, self.n_jobs),
+        )
+        self.adjusted_total = adjusted_total
+
+    def resume_matrix(self, resume_keywords: list):
+        """Binary resumes x terms matrix; terms outside the job vocabulary are dropped."""
+        rows, cols = [], []
+        for i, keywords in enumerate(resume_keywords):
+            for term in keywords:
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    rows.append(i)
+                    cols.append(column)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, cols)),
+            shape=(len(resume_keywords), len(self.vocabulary)),
+        )
+
+    def matched_counts(self, resume_matrix) -> np.ndarray:
+        """Matched requirements (regular keywords + matched groups) per resume/job pair."""
+        matched_regular = resume_matrix @ self.regular
+        group_hits = resume_matrix @ self.groups
+        group_hits.data[:] = 1
+        matched_groups = group_hits @ self.group_jobs
+        return (matched_regular + matched_groups).toarray()
+
+    def scores(self, resume_keywords: list) -> np.ndarray:
+        """Keyword score (0-100, int) for every resume/job pair, shape (resumes, jobs)."""
+        total_matched = self.matched_counts(self.resume_matrix(resume_keywords))
+        scores = np.zeros(total_matched.shape, dtype=np.int64)
+        has_total = self.adjusted_total > 0
+        # Same float expression as the per-pair path so truncation matches exactly
+        scores[:, has_total] = np.trunc(
+            (total_matched[:, has_total] / self.adjusted_total[has_total]) * 100
+        ).astype(np.int64)
+        return scores
@@ -0,0 +1,101 @@
+import asyncio
+import hashlib
+import time
+import uuid
+from collections import Counter, OrderedDict
+
+from app.core.config import settings
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", errors="ignore")).hexdigest()
+
+
+class SectionState:
+    """Cached chunk embedding for one resume section, keyed by its content hash."""
+    __slots__ = ("title", "embedding")
+
+    def __init__(self, title: str, embedding):
+        self.title = title
+        self.embedding = embedding
+
+
+class ReanalysisSession:
+    """
+    State kept between re-submissions of the same resume against the same job.
+    Job-side results are reset whenever the job text changes.
+    """
+    __slots__ = (
+        "session_id", "lock", "job_hash", "job_keywords", "or_groups", "job_embedding",
+        "sections", "section_chars", "text_length", "gpt_analysis", "llm_section_chars", "llm_text_length",
+        "result", "updated_at",
+    )
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        # Held for a whole re-analysis so overlapping requests don't interleave
+        self.lock = asyncio.Lock()
+        self.job_hash = None
+        self.job_keywords = set()
+        self.or_groups = []
+        self.job_embedding = None
+        self.reset_resume()
+        self.updated_at = time.monotonic()
+
+    def reset_job(self, job_hash: str, job_keywords: set, or_groups: list, job_embedding):
+        self.job_hash = job_hash
+        self.job_keywords = job_keywords
+        self.or_groups = or_groups
+        self.job_embedding = job_embedding
+        # Previous scores were against a different job
+        self.reset_resume()
+
+    def reset_resume(self):
+        # section hash -> SectionState for the last submitted version, and the
+        # characters each section takes up in it (length x occurrences)
+        self.sections = {}
+        self.section_chars = Counter()
+        self.text_length = 0
+        # Last Gemini analysis with the sections of the version it scored, so
+        # drift is measured from there rather than from the previous version
+        self.gpt_analysis = None
+        self.llm_section_chars = Counter()
+        self.llm_text_length = 0
+        # Last response body, for score deltas
+        self.result = None
+
+
+class SessionStore:
+    """In-memory LRU of re-analysis sessions with idle expiry."""
+    def __init__(self, max_sessions: int, ttl_seconds: float):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions = OrderedDict()
+
+    def get(self, session_id: str):
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - session.updated_at > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def create(self) -> ReanalysisSession:
+        session = ReanalysisSession(uuid.uuid4().hex)
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def touch(self, session: ReanalysisSession):
+        session.updated_at = time.monotonic()
+        if session.session_id in self._sessions:
+            self._sessions.move_to_end(session.session_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+sessions = SessionStore(settings.MAX_SESSIONS, settings.SESSION_TTL_SECONDS)
@@ -1,9 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes_resume import router as resume_router
+from app.core import admission
 
 app = FastAPI()
 
+# Added before CORS so that shed responses still carry CORS headers
+app.add_middleware(admission.AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -13,3 +17,9 @@ app.add_middleware(
 )
 
 app.include_router(resume_router, prefix="/api", tags=["Resume"])
+
+
+@app.get("/api/admission/stats", tags=["Monitoring"])
+def admission_stats():
+    """Queue depth, active slots, admitted and shed counts per stage"""
+    return admission.stats()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Load Test /api/analyze
+Run in-process against the FastAPI app with a stubbed Gemini:
+    python load_test.py --concurrency 1,2,4,8,16 --requests 40
+Or against a running server (start it with GEMINI_STUB=1 to use the stub there):
+    GEMINI_STUB=1 GEMINI_STUB_LATENCY_MS=800 uvicorn app.main:app --port 8000
+    python load_test.py --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import glob
+import os
+import random
+import time
+from pathlib import Path
+
+import httpx
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure /api/analyze throughput and latency at increasing concurrency")
+    parser.add_argument("--url", help="Base URL of a running server (default: run the app in-process)")
+    parser.add_argument("--concurrency", default="1,2,4,8,16", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per concurrency level")
+    parser.add_argument("--pdf-ratio", type=float, default=0.3, help="Fraction of resumes sent as PDF")
+    parser.add_argument("--resumes", default=str(ASSETS_DIR / "sample_resume_*.txt"), help="Glob of resume text files")
+    parser.add_argument("--pdfs", help="Glob of real PDF resumes (default: render the text resumes to PDF)")
+    parser.add_argument("--jobs", default=str(ASSETS_DIR / "job_description.txt"), help="Glob of job description files")
+    parser.add_argument("--priority", default="interactive", choices=["interactive", "bulk"])
+    parser.add_argument("--stub-latency-ms", type=float, default=800, help="Stub Gemini latency (in-process only)")
+    parser.add_argument("--stub-malformed-rate", type=float, default=0.05, help="Stub malformed JSON rate (in-process only)")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0, help="Stub API error rate (in-process only)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.requests <= 0:
+        parser.error("--requests must be positive")
+    try:
+        args.levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    except ValueError:
+        parser.error(f"--concurrency must be comma-separated integers, got {args.concurrency!r}")
+    if not args.levels or min(args.levels) <= 0:
+        parser.error("--concurrency needs at least one positive level")
+    return args
+
+
+def text_to_pdf(text: str) -> bytes:
+    """Render plain text into a minimal multi-page PDF that pdfplumber can read."""
+    lines = [line.encode("latin-1", errors="replace") for line in text.splitlines()] or [b""]
+    pages = [lines[i:i + 60] for i in range(0, len(lines), 60)]
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page_lines in pages:
+        escaped = [line.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") for line in page_lines]
+        stream = b"BT /F1 10 Tf 12 TL 50 780 Td " + b" ".join(b"(" + line + b") Tj T*" for line in escaped) + b" ET"
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(page_ids)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+def load_corpus(args):
+    resumes = [Path(path).read_text(encoding="utf-8", errors="ignore") for path in sorted(glob.glob(args.resumes))]
+    jobs = [Path(path).read_text(encoding="utf-8", errors="ignore") for path in sorted(glob.glob(args.jobs))]
+    if args.pdfs:
+        pdfs = [Path(path).read_bytes() for path in sorted(glob.glob(args.pdfs))]
+    else:
+        pdfs = [text_to_pdf(text) for text in resumes]
+    if not resumes or not jobs:
+        raise SystemExit("No resumes or job descriptions found - check --resumes and --jobs")
+    return resumes, pdfs, jobs
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def parse_server_timing(header: str) -> dict:
+    timings = {}
+    for part in (header or "").split(","):
+        name, _, dur = part.strip().partition(";dur=")
+        if name and dur:
+            timings[name] = float(dur)
+    return timings
+
+
+async def send_one(client, request_spec, args, results):
+    filename, content, job_text = request_spec
+    start = time.perf_counter()
+    try:
+        response = await client.post(
+            "/api/analyze",
+            files={"resume": (filename, content)},
+            data={"job_text": job_text},
+            headers={"X-Priority": args.priority},
+        )
+    except Exception as e:
+        results.append({"latency": (time.perf_counter() - start) * 1000, "outcome": "error", "error": str(e)})
+        return
+
+    result = {"latency": (time.perf_counter() - start) * 1000, "status": response.status_code}
+    if response.status_code in (429, 503):
+        result["outcome"] = "shed"
+    elif response.status_code != 200:
+        result["outcome"] = "error"
+        result["error"] = response.text[:200]
+    else:
+        body = response.json()
+        result["outcome"] = "ok" if body.get("gpt_analysis", {}).get("enabled") else "fallback"
+        result["stages"] = parse_server_timing(response.headers.get("server-timing"))
+    results.append(result)
+
+
+async def run_level(client, corpus, concurrency, args, rng):
+    resumes, pdfs, jobs = corpus
+    specs = []
+    for i in range(args.requests):
+        job_text = rng.choice(jobs)
+        if rng.random() < args.pdf_ratio:
+            specs.append((f"resume_{i}.pdf", rng.choice(pdfs), job_text))
+        else:
+            specs.append((f"resume_{i}.txt", rng.choice(resumes).encode("utf-8"), job_text))
+
+    queue = asyncio.Queue()
+    for spec in specs:
+        queue.put_nowait(spec)
+    results = []
+
+    async def worker():
+        while not queue.empty():
+            await send_one(client, queue.get_nowait(), args, results)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+
+def summarize(concurrency, results, elapsed):
+    completed = [r for r in results if r["outcome"] in ("ok", "fallback")]
+    stages = {}
+    for r in completed:
+        for name, ms in r.get("stages", {}).items():
+            stages.setdefault(name, []).append(ms)
+    latencies = [r["latency"] for r in completed]
+    total = len(results)
+    return {
+        "concurrency": concurrency,
+        "throughput": len(completed) / elapsed if elapsed > 0 else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "stages": {name: (percentile(values, 50), percentile(values, 99)) for name, values in stages.items()},
+        "error_rate": sum(r["outcome"] == "error" for r in results) / total,
+        "shed_rate": sum(r["outcome"] == "shed" for r in results) / total,
+        "fallback_rate": sum(r["outcome"] == "fallback" for r in results) / total,
+        "errors": [r["error"] for r in results if r.get("error")][:3],
+    }
+
+
+def print_summary(summary):
+    print(f"\nConcurrency {summary['concurrency']}:")
+    print(f"   Throughput:    {summary['throughput']:.2f} req/s")
+    print(f"   Latency:       p50 {summary['p50']:.0f} ms, p99 {summary['p99']:.0f} ms")
+    for name, (p50, p99) in summary["stages"].items():
+        print(f"   - {name:<12} p50 {p50:.1f} ms, p99 {p99:.1f} ms")
+    print(f"   Errors: {summary['error_rate']:.1%}  Shed: {summary['shed_rate']:.1%}  "
+          f"Gemini fallback: {summary['fallback_rate']:.1%}")
+    for error in summary["errors"]:
+        print(f"   ! {error}")
+
+
+def find_saturation(summaries):
+    """The last level where adding concurrency still raised throughput by at least 5%."""
+    best = summaries[0]
+    for summary in summaries[1:]:
+        if summary["throughput"] < best["throughput"] * 1.05:
+            return best
+        best = summary
+    return None
+
+
+async def main():
+    args = parse_args()
+    rng = random.Random(args.seed)
+    corpus = load_corpus(args)
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        target = args.url
+    else:
+        # Settings and the Gemini client are read at import time, so configure the stub first
+        os.environ["GEMINI_STUB"] = "1"
+        os.environ["GEMINI_STUB_LATENCY_MS"] = str(args.stub_latency_ms)
+        os.environ["GEMINI_STUB_MALFORMED_RATE"] = str(args.stub_malformed_rate)
+        os.environ["GEMINI_STUB_ERROR_RATE"] = str(args.stub_error_rate)
+        print("Loading app in-process...")
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout)
+        target = "in-process app (Gemini stub)"
+
+    print("=" * 80)
+    print(f"LOAD TEST: {target}")
+    print(f"{len(corpus[0])} resumes, {len(corpus[2])} jobs, {args.pdf_ratio:.0%} PDF, "
+          f"{args.requests} requests per level, priority={args.priority}")
+    print("=" * 80)
+
+    summaries = []
+    async with client:
+        for concurrency in args.levels:
+            results, elapsed = await run_level(client, corpus, concurrency, args, rng)
+            summary = summarize(concurrency, results, elapsed)
+            summaries.append(summary)
+            print_summary(summary)
+
+    print("\n" + "=" * 80)
+    saturation = find_saturation(summaries)
+    if len(summaries) == 1:
+        print("Single concurrency level - pass several, e.g. --concurrency 1,2,4,8, to find the saturation point")
+    elif saturation:
+        print(f"Saturation point: ~{saturation['concurrency']} concurrent requests "
+              f"({saturation['throughput']:.2f} req/s, p99 {saturation['p99']:.0f} ms)")
+    else:
+        print("Throughput still rising at the highest level - try higher --concurrency")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Test Embedding Store Correctness, Accuracy and Startup Cost vs float32
+Run: python test_embedding_store.py [rows] [--minilm]
+Uses synthetic unit vectors; --minilm seeds the benchmark corpus with real MiniLM
+vectors of the sample asset lines instead (needs the model weights).
+"""
+
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from app.core import embedding_store
+from app.core.embedding_store import EmbeddingStore
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+ARGS = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+ROWS = int(ARGS[0]) if ARGS else 200_000
+USE_MINILM = "--minilm" in sys.argv
+DIM = 384
+TOP_K = 10
+# Max cosine error vs float32 for unit vectors
+ERROR_BOUNDS = {"float16": 1e-3, "int8": 1e-2}
+
+rng = np.random.default_rng(0)
+
+
+def unit_vectors(rows, dim=DIM):
+    vectors = rng.normal(size=(rows, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_meta_mismatch(tmp):
+    EmbeddingStore(tmp / "meta", dim=DIM, dtype="int8").add(["a"], unit_vectors(1))
+    for kwargs in ({"dtype": "float32"}, {"dtype": "float16"}, {"dim": 128}):
+        try:
+            EmbeddingStore(tmp / "meta", **kwargs)
+        except ValueError:
+            continue
+        raise AssertionError(f"{kwargs} on an int8/{DIM} store did not raise")
+    store = EmbeddingStore(tmp / "meta")
+    assert (store.dtype, store.dim, len(store)) == ("int8", DIM, 1)
+    try:
+        EmbeddingStore(tmp / "new", dtype="float32")
+        raise AssertionError("Unsupported dtype on a new store did not raise")
+    except ValueError:
+        pass
+    print("   ✓ dtype/dim that differ from an existing store raise ValueError")
+
+
+def test_reader_refresh(tmp):
+    writer = EmbeddingStore(tmp / "refresh")
+    reader = EmbeddingStore(tmp / "refresh")
+    vectors = unit_vectors(20)
+    writer.add([f"r{i}" for i in range(10)], vectors[:10])
+    reader.refresh()
+    assert len(reader) == 10 and "r9" in reader
+    writer.add([f"r{i}" for i in range(10, 20)], vectors[10:])
+    # similarity() refreshes by itself
+    assert reader.similarity(vectors[15]).shape == (20,)
+    assert len(reader) == 20 and reader.ids == [f"r{i}" for i in range(20)]
+    assert np.allclose(reader.get("r15"), vectors[15], atol=1e-3)
+    print("   ✓ Reader picks up rows another instance appended")
+
+
+def test_torn_tail(tmp):
+    for dtype in ("float16", "int8"):
+        path = tmp / f"torn-{dtype}"
+        store = EmbeddingStore(path, dtype=dtype)
+        vectors = unit_vectors(6)
+        store.add(["t0", "t1", "t2"], vectors[:3])
+        # A writer dies mid-append: a full vector and hash, half of the next vector, no IDs
+        with open(path / "vectors.bin", "ab") as f:
+            f.write(b"\x01" * (store._row_bytes + 5))
+        with open(path / "hashes.bin", "ab") as f:
+            f.write(b"\x02" * 8)
+        if dtype == "int8":
+            with open(path / "scales.bin", "ab") as f:
+                f.write(b"\x03" * 6)
+        with open(path / "ids.txt", "ab") as f:
+            f.write(b"t-partial")
+
+        reader = EmbeddingStore(path)
+        assert len(reader) == 3 and reader.rows == 3 and "t-partial" not in reader
+
+        # The next append drops the torn tail before writing
+        writer = EmbeddingStore(path)
+        writer.add(["t3", "t4", "t5"], vectors[3:])
+        assert (path / "vectors.bin").stat().st_size == 6 * store._row_bytes
+        assert (path / "hashes.bin").stat().st_size == 6 * 8
+        if dtype == "int8":
+            assert (path / "scales.bin").stat().st_size == 6 * 4
+        reader.refresh()
+        assert reader.ids == [f"t{i}" for i in range(6)]
+        for i in range(6):
+            assert np.allclose(reader.get(f"t{i}"), vectors[i], atol=ERROR_BOUNDS[dtype]), (dtype, i)
+    print("   ✓ Torn tail from an interrupted append is ignored, then truncated (float16 and int8)")
+
+
+def test_readd(tmp):
+    store = EmbeddingStore(tmp / "readd", dtype="int8")
+    vectors = unit_vectors(7)
+    store.add([f"a{i}" for i in range(6)], vectors[:6])
+    store.add(["a1"], vectors[6:])
+    scores = store.similarity(vectors[6])
+    assert len(store) == 6 and store.rows == 7 and scores.shape == (7,)
+    assert store.ids[1] == store.ids[6] == "a1"
+    assert scores[1] == -np.inf and scores[6] > 0.99, scores
+    assert np.allclose(store.get("a1"), vectors[6], atol=1e-2)
+
+    results = store.top_k(vectors[6], k=10)
+    assert [item_id for item_id, _ in results].count("a1") == 1 and results[0][0] == "a1", results
+    assert len(results) == 6
+
+    # Scales stay one per row across batches, and the old row's scale is untouched
+    assert (store.path / "scales.bin").stat().st_size == 7 * 4
+    assert np.allclose(store._rows(1, 2)[0], vectors[1], atol=1e-2)
+    print("   ✓ Re-added ID replaces its old row in get/top_k; superseded column scores -inf")
+
+
+def test_hash_collision(tmp):
+    original = embedding_store.id_hash
+    embedding_store.id_hash = lambda item_id: 7
+    try:
+        store = EmbeddingStore(tmp / "collision")
+        vectors = unit_vectors(3)
+        store.add(["x", "y", "x"], vectors)
+        assert len(store) == 2 and "x" in store and "y" in store and "z" not in store
+        assert np.allclose(store.get("x"), vectors[2], atol=1e-3)
+        assert np.allclose(store.get("y"), vectors[1], atol=1e-3)
+    finally:
+        embedding_store.id_hash = original
+    print("   ✓ IDs sharing a hash stay distinct")
+
+
+def corpus_vectors():
+    """Clustered unit vectors: jittered copies of a few thousand base vectors."""
+    if USE_MINILM:
+        from app.api.routes_resume import encode_texts
+        lines = [
+            line.strip()
+            for path in sorted(ASSETS_DIR.glob("*.txt"))
+            for line in path.read_text(encoding="utf-8").splitlines()
+            if len(line.strip()) > 20
+        ]
+        real = np.asarray(encode_texts(lines), dtype=np.float32)
+    else:
+        real = unit_vectors(2000)
+    # The jittered copies are near-duplicates, so top-k recall here is a pessimistic bound
+    base = real[rng.integers(0, len(real), ROWS)]
+    corpus = base + rng.normal(0, 0.02, base.shape).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = real[rng.choice(len(real), size=min(50, len(real)), replace=False)]
+    return corpus, queries
+
+
+def benchmark(tmp):
+    corpus, queries = corpus_vectors()
+    ids = [f"resume-{i}" for i in range(ROWS)]
+    exact = queries @ corpus.T
+
+    pickle_path = tmp / "embeddings.pkl"
+    with open(pickle_path, "wb") as f:
+        pickle.dump(dict(zip(ids, corpus)), f)
+    start = time.perf_counter()
+    with open(pickle_path, "rb") as f:
+        pickle.load(f)
+    pickle_load = time.perf_counter() - start
+    print(f"\n   float32 pickle baseline: {pickle_path.stat().st_size / 1e6:.1f} MB, load {pickle_load * 1000:.0f} ms")
+
+    for dtype in ("float16", "int8"):
+        store_path = tmp / f"bench-{dtype}"
+        EmbeddingStore(store_path, dim=corpus.shape[1], dtype=dtype).add(ids, corpus)
+        size = sum(p.stat().st_size for p in store_path.iterdir())
+
+        start = time.perf_counter()
+        store = EmbeddingStore(store_path)
+        open_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        approx = store.similarity(queries)
+        query_time = time.perf_counter() - start
+
+        error = np.abs(approx - exact)
+        recall = np.mean([
+            len(set(np.argsort(-exact[q])[:TOP_K]) & set(np.argsort(-approx[q])[:TOP_K])) / TOP_K
+            for q in range(len(queries))
+        ])
+        print(f"\n   {dtype}:")
+        print(f"   - Size: {size / 1e6:.1f} MB, open: {open_time * 1000:.0f} ms")
+        print(f"   - {len(queries)} queries x {ROWS} rows: {query_time * 1000:.0f} ms")
+        print(f"   - Cosine error vs float32: mean {error.mean():.2e}, max {error.max():.2e}")
+        print(f"   - Top-{TOP_K} recall vs float32: {recall:.1%}")
+        assert error.max() < ERROR_BOUNDS[dtype], (dtype, error.max())
+        print(f"   ✓ Max cosine error below {ERROR_BOUNDS[dtype]:.0e}")
+
+
+def main():
+    print("=" * 80)
+    print("EMBEDDING STORE TEST")
+    print("=" * 80 + "\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        test_meta_mismatch(tmp)
+        test_reader_refresh(tmp)
+        test_torn_tail(tmp)
+        test_readd(tmp)
+        test_hash_collision(tmp)
+        print(f"\nAccuracy and startup cost ({ROWS} rows, {'MiniLM' if USE_MINILM else 'synthetic'} vectors)")
+        benchmark(tmp)
+    print("\n" + "=" * 80)
+    print("✅ ALL EMBEDDING STORE TESTS PASSED")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test Sparse Keyword Scoring Matches the Per-Pair Path
+Run: python test_keyword_matrix.py
+"""
+
+import random
+import time
+from pathlib import Path
+
+from app.api.routes_resume import (
+    TECHNICAL_TERMS, parse_document, extract_keywords, extract_or_groups, score_keywords,
+)
+from app.core.keyword_matrix import KeywordCoverageIndex
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+
+rng = random.Random(0)
+terms = sorted(TECHNICAL_TERMS)
+
+print("=" * 80)
+print("SPARSE KEYWORD SCORING TEST")
+print("=" * 80)
+
+# Jobs: the sample job description plus random keyword sets with "or" groups
+job_keywords, job_or_groups = [], []
+for job_text in [
+    (ASSETS_DIR / "job_description.txt").read_text(encoding="utf-8"),
+    "Experience with Python or Java. C++, Rust, or Go. Linux/Android or RTOS preferred.",
+]:
+    doc = parse_document(job_text)
+    keywords = extract_keywords(doc)
+    job_keywords.append(keywords)
+    job_or_groups.append(extract_or_groups(doc, keywords))
+
+for _ in range(48):
+    keywords = set(rng.sample(terms, rng.randint(0, 25)))
+    groups = []
+    for _ in range(rng.randint(0, 4)):
+        if len(keywords) >= 2:
+            groups.append(set(rng.sample(sorted(keywords), rng.randint(2, min(4, len(keywords))))))
+    job_keywords.append(keywords)
+    job_or_groups.append(groups)
+
+# Resumes: the sample resumes plus random keyword sets
+resume_keywords = [
+    extract_keywords(parse_document(path.read_text(encoding="utf-8")))
+    for path in sorted(ASSETS_DIR.glob("sample_resume_*.txt"))
+]
+resume_keywords += [set(rng.sample(terms, rng.randint(0, 40))) for _ in range(2000)]
+resume_keywords.append(set())
+
+print(f"\n{len(resume_keywords)} resumes x {len(job_keywords)} jobs")
+
+start = time.perf_counter()
+index = KeywordCoverageIndex(job_keywords, job_or_groups)
+scores = index.scores(resume_keywords)
+sparse_time = time.perf_counter() - start
+
+start = time.perf_counter()
+expected = [
+    [score_keywords(resume, keywords, groups)[0] for keywords, groups in zip(job_keywords, job_or_groups)]
+    for resume in resume_keywords
+]
+per_pair_time = time.perf_counter() - start
+
+mismatches = [
+    (i, j, scores[i, j], expected[i][j])
+    for i in range(len(resume_keywords))
+    for j in range(len(job_keywords))
+    if scores[i, j] != expected[i][j]
+]
+
+print(f"   Sparse:   {sparse_time * 1000:.0f} ms")
+print(f"   Per-pair: {per_pair_time * 1000:.0f} ms")
+
+if mismatches:
+    print(f"\n❌ {len(mismatches)} mismatched pairs, first few (resume, job, sparse, per-pair):")
+    for mismatch in mismatches[:5]:
+        print(f"   {mismatch}")
+    exit(1)
+
+print("\n" + "=" * 80)
+print(f"✅ ALL {scores.size} PAIRS MATCH")
+print("=" * 80)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test Incremental Re-analysis Matches /api/analyze Keywords
+Run: python test_reanalyze.py
+Gemini is replaced by a zero-latency stub, so timings cover only the keyword and
+embedding stages while LLM re-run decisions are still exercised.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+
+# Settings and the Gemini client are read at import time, so configure the stub first
+os.environ.update(GEMINI_STUB="1", GEMINI_STUB_LATENCY_MS="0", GEMINI_STUB_JITTER_MS="0",
+                  GEMINI_STUB_MALFORMED_RATE="0", GEMINI_STUB_ERROR_RATE="0")
+
+import httpx
+
+from app.core.config import settings
+from app.main import app
+
+ASSETS_DIR = Path(__file__).resolve().parent.parent / "assets"
+KEYWORD_FIELDS = ("keyword_score", "resume_keywords", "matched_keywords", "missing_keywords")
+
+resume = (ASSETS_DIR / "sample_resume_amazon.txt").read_text(encoding="utf-8")
+job = (ASSETS_DIR / "job_description.txt").read_text(encoding="utf-8")
+other_job = "Embedded engineer: C++, Rust, or Go. Linux/Android or RTOS preferred. FPGA and Verilog a plus."
+edited = resume.replace(
+    "CERTIFICATIONS & TRAINING\n", "CERTIFICATIONS & TRAINING\nCertified Kubernetes Administrator, Terraform\n"
+)
+removed = edited.replace(edited[edited.index("AWARDS & ACHIEVEMENTS"):edited.index("ADDITIONAL INFORMATION")], "")
+# All-caps header lines (and the name line) rewritten as "Work Experience"-style Title Case
+title_case = "\n".join(line.title() if line.isupper() else line for line in resume.split("\n"))
+assert resume != edited != removed and "Technical Skills" in title_case
+
+# (name, resume text, job text)
+STEPS = [
+    ("First submission", resume, job),
+    ("One-section edit", edited, job),
+    ("Section removed", removed, job),
+    ("Duplicated sections", edited + "\n" + edited, job),
+    ("Job change", edited, other_job),
+]
+
+
+async def post(client, path, resume_text, job_text, session_id=None):
+    data = {"job_text": job_text}
+    if session_id:
+        data["session_id"] = session_id
+    start = time.perf_counter()
+    response = await client.post(path, files={"resume": ("resume.txt", resume_text.encode())}, data=data)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert response.status_code == 200, (path, response.status_code, response.text)
+    return response.json(), elapsed
+
+
+def check_parity(name, body, expected):
+    for field in KEYWORD_FIELDS:
+        assert body[field] == expected[field], (name, field, body[field], expected[field])
+
+
+async def check_llm_drift(client):
+    """Ten versions, each rewriting one more of ten equal sections."""
+    sections = [f"PROJECT {chr(65 + i)}\n" + f"Built Python services on AWS for team {i}. " * 6 for i in range(10)]
+    session_id = None
+    reruns = 0
+    for version in range(11):
+        text = "\n".join(
+            section.replace("Python services on AWS", "Rust firmware on ARM") if i < version else section
+            for i, section in enumerate(sections)
+        )
+        body, _ = await post(client, "/api/reanalyze", text, job, session_id)
+        session_id = body["session_id"]
+        changes = body["changes"]
+        if version:
+            assert changes["change_ratio"] < settings.REANALYZE_LLM_THRESHOLD, changes
+        if changes["llm_rerun"]:
+            reruns += 1
+        else:
+            assert changes["llm_change_ratio"] < settings.REANALYZE_LLM_THRESHOLD, changes
+    # Each step changes ~10%, so Gemini re-runs at least every other version
+    assert reruns >= 5, reruns
+    print(f"   ✓ Gradual rewrite over 10 versions re-ran Gemini {reruns} times, not just once")
+
+
+async def main():
+    print("=" * 80)
+    print("INCREMENTAL RE-ANALYSIS TEST")
+    print("=" * 80 + "\n")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test", timeout=60) as client:
+        # Warm up the model so the first timed request isn't paying for it
+        await post(client, "/api/analyze", resume, job)
+
+        session_id = None
+        print(f"   {'Step':<22} {'reanalyze':>10} {'analyze':>10}  changed / reused")
+        for name, resume_text, job_text in STEPS:
+            body, reanalyze_ms = await post(client, "/api/reanalyze", resume_text, job_text, session_id)
+            expected, analyze_ms = await post(client, "/api/analyze", resume_text, job_text)
+            check_parity(name, body, expected)
+            changes = body["changes"]
+            assert changes["sections_reused"] >= 0, (name, changes)
+            assert len(changes["sections_changed"]) == len(set(changes["sections_changed"])), (name, changes)
+            assert 0 <= changes["change_ratio"] <= 1, (name, changes)
+            if name == "Section removed":
+                assert changes["sections_removed"] == ["awards & achievements"], changes
+                assert changes["sections_changed"] == [], changes
+            session_id = body["session_id"]
+            print(f"   {name:<22} {reanalyze_ms:>8.0f}ms {analyze_ms:>8.0f}ms  "
+                  f"{len(changes['sections_changed'])} / {changes['sections_reused']}")
+        print("\n   ✓ Keyword score and keyword sets match /api/analyze at every step")
+
+        # Overlapping requests on one session with different jobs each get their own job's result
+        (first, _), (second, _) = await asyncio.gather(
+            post(client, "/api/reanalyze", resume, job, session_id),
+            post(client, "/api/reanalyze", edited, other_job, session_id),
+        )
+        check_parity("Overlapping (job)", first, (await post(client, "/api/analyze", resume, job))[0])
+        check_parity("Overlapping (other job)", second, (await post(client, "/api/analyze", edited, other_job))[0])
+        print("   ✓ Overlapping requests on one session don't mix job state")
+
+        # Title Case headers still split the resume, so an edit only re-embeds its section
+        body, _ = await post(client, "/api/reanalyze", title_case, job)
+        body, _ = await post(client, "/api/reanalyze", title_case.replace("Python", "Python, Kotlin", 1), job,
+                             body["session_id"])
+        assert body["changes"]["sections_reused"] >= 6, body["changes"]
+        print(f"   ✓ Title Case headers are sections: {body['changes']['sections_reused']} reused after an edit")
+
+        # Small edits that add up across versions re-run Gemini once the drift from
+        # the version it scored reaches the threshold
+        await check_llm_drift(client)
+
+    print("\n" + "=" * 80)
+    print("✅ ALL RE-ANALYSIS TESTS PASSED")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())